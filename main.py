@@ -1,10 +1,56 @@
 #!/usr/bin/env python3
 import sys
 import os
+import io
 import json
+import time
+import pickle
+import asyncio
+import inspect
+import collections
 import importlib.util
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode()
+
+
+# Per-thread/per-task capture target for test output. contextvars give
+# each pool thread and each asyncio task its own value, so concurrent
+# tests cannot steal each other's buffers the way a process-global
+# redirect_stdout swap can.
+_capture_buffer = contextvars.ContextVar('capture_buffer', default=None)
+
+
+class _StdoutDispatcher(io.TextIOBase):
+    def __init__(self, target):
+        self._target = target
+
+    def write(self, s):
+        buffer = _capture_buffer.get()
+        if buffer is None:
+            return self._target.write(s)
+        return buffer.write(s)
+
+    def flush(self):
+        if _capture_buffer.get() is None:
+            self._target.flush()
+
+
+TestSpec = collections.namedtuple('TestSpec', 'name file enabled parameters')
+
+# Bumped when the shape of cached plan entries changes, so stale
+# pickles from older versions are ignored.
+_PLAN_FORMAT = 2
+
 
 class EnumerationFramework:
     def __init__(self, config_path="config.json"):
@@ -12,11 +58,19 @@ class EnumerationFramework:
         self.config = {}
         self.tests = {}
         self.results = {}
+        self.plan_cache_path = os.path.join(
+            os.path.expanduser('~'), '.cache', 'enumfw', 'plan.pkl')
         
     def load_config(self):
         try:
             with open(self.config_path, 'r') as f:
                 self.config = json.load(f)
+            if 'tests' in self.config:
+                self.config['tests'] = [
+                    TestSpec(t['name'], t['file'],
+                             t.get('enabled', False), t.get('parameters', {}))
+                    for t in self.config['tests']
+                ]
             print(f"Configuration loaded from {self.config_path}")
             return True
         except FileNotFoundError:
@@ -26,84 +80,207 @@ class EnumerationFramework:
             print(f"Error parsing configuration file: {e}")
             return False
     
+    _module_cache = {}
+
     def load_test_module(self, test_path):
         try:
+            key = (os.path.abspath(test_path), os.path.getmtime(test_path))
+            if key in self._module_cache:
+                return self._module_cache[key]
+
             module_name = os.path.basename(test_path).replace('.py', '')
             spec = importlib.util.spec_from_file_location(module_name, test_path)
             module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
             spec.loader.exec_module(module)
+            self._module_cache[key] = module
             return module
         except Exception as e:
             print(f"Error loading test module {test_path}: {e}")
             return None
     
+    def _plan_signature(self, tests_dir):
+        try:
+            return (_PLAN_FORMAT,
+                    self.config_path,
+                    os.path.getmtime(self.config_path),
+                    os.path.getmtime(tests_dir))
+        except OSError:
+            return None
+
+    def _load_cached_plan(self, sig):
+        if sig is None:
+            return None
+        try:
+            with open(self.plan_cache_path, 'rb') as f:
+                cached_sig, plan = pickle.load(f)
+            if cached_sig == sig:
+                return plan
+        except Exception:
+            pass
+        return None
+
+    def _save_cached_plan(self, sig, plan):
+        if sig is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.plan_cache_path), exist_ok=True)
+            with open(self.plan_cache_path, 'wb') as f:
+                pickle.dump((sig, plan), f)
+        except Exception as e:
+            print(f"Could not write plan cache: {e}")
+
     def discover_tests(self):
         if 'tests' not in self.config:
             print("No tests defined in configuration")
             return False
-        
+
         tests_dir = self.config.get('tests_directory', 'tests')
-        
-        for test_config in self.config['tests']:
-            if not test_config.get('enabled', False):
-                print(f"Skipping disabled test: {test_config['name']}")
-                continue
-            
-            test_file = test_config['file']
-            test_path = os.path.join(tests_dir, test_file)
-            
-            if not os.path.exists(test_path):
-                print(f"Test file not found: {test_path}")
-                continue
-            
+
+        sig = self._plan_signature(tests_dir)
+        plan = self._load_cached_plan(sig)
+
+        if plan is None:
+            plan = []
+            for spec in self.config['tests']:
+                if not spec.enabled:
+                    print(f"Skipping disabled test: {spec.name}")
+                    continue
+
+                test_path = os.path.join(tests_dir, spec.file)
+
+                if not os.path.exists(test_path):
+                    print(f"Test file not found: {test_path}")
+                    continue
+
+                plan.append((spec.name, test_path, spec))
+            self._save_cached_plan(sig, plan)
+
+        for test_name, test_path, test_config in plan:
             module = self.load_test_module(test_path)
             if module and hasattr(module, 'run'):
-                self.tests[test_config['name']] = {
+                self.tests[test_name] = {
                     'module': module,
                     'config': test_config
                 }
-                print(f"Loaded test: {test_config['name']}")
+                print(f"Loaded test: {test_name}")
             else:
-                print(f"Test module {test_file} missing 'run' function")
-        
+                print(f"Test module {test_path} missing 'run' function")
+
         return len(self.tests) > 0
     
-    def run_test(self, test_name, test_info):
-        print(f"\n{'='*60}")
-        print(f"Running: {test_name}")
-        print(f"{'='*60}")
-        
+    def _run_test_capture(self, test_name, test_info):
+        buffer = io.StringIO()
+        buffer.write(f"\n{'='*60}\n")
+        buffer.write(f"Running: {test_name}\n")
+        buffer.write(f"{'='*60}\n")
+
         try:
             module = test_info['module']
-            config = test_info['config']
-            
-            params = config.get('parameters', {})
-            result = module.run(params)
-            
-            self.results[test_name] = {
+            spec = test_info['config']
+
+            params = spec.parameters
+            token = _capture_buffer.set(buffer)
+            try:
+                result = module.run(params)
+            finally:
+                _capture_buffer.reset(token)
+
+            entry = {
                 'status': 'success',
                 'result': result,
-                'timestamp': datetime.now().isoformat()
+                'timestamp_ns': time.time_ns()
             }
-            
+
         except Exception as e:
-            print(f"Error executing test {test_name}: {e}")
-            self.results[test_name] = {
+            buffer.write(f"Error executing test {test_name}: {e}\n")
+            entry = {
                 'status': 'error',
                 'error': str(e),
-                'timestamp': datetime.now().isoformat()
+                'timestamp_ns': time.time_ns()
             }
-    
+
+        return entry, buffer.getvalue()
+
+    async def _run_async_test_capture(self, test_name, test_info):
+        buffer = io.StringIO()
+        buffer.write(f"\n{'='*60}\n")
+        buffer.write(f"Running: {test_name}\n")
+        buffer.write(f"{'='*60}\n")
+
+        try:
+            module = test_info['module']
+            spec = test_info['config']
+
+            token = _capture_buffer.set(buffer)
+            try:
+                result = await module.run(spec.parameters)
+            finally:
+                _capture_buffer.reset(token)
+
+            entry = {
+                'status': 'success',
+                'result': result,
+                'timestamp_ns': time.time_ns()
+            }
+
+        except Exception as e:
+            buffer.write(f"Error executing test {test_name}: {e}\n")
+            entry = {
+                'status': 'error',
+                'error': str(e),
+                'timestamp_ns': time.time_ns()
+            }
+
+        return entry, buffer.getvalue()
+
+    async def _run_async_tests(self, async_tests):
+        tasks = {
+            test_name: asyncio.ensure_future(
+                self._run_async_test_capture(test_name, test_info))
+            for test_name, test_info in async_tests.items()
+        }
+        for test_name, task in tasks.items():
+            entry, output = await task
+            self.results[test_name] = entry
+            print(output, end='')
+
     def run_all_tests(self):
         if not self.tests:
             print("No tests loaded to execute")
             return
-        
+
         print(f"\nStarting enumeration with {len(self.tests)} test(s)")
-        
+
+        sync_tests = {}
+        async_tests = {}
         for test_name, test_info in self.tests.items():
-            self.run_test(test_name, test_info)
-        
+            if inspect.iscoroutinefunction(test_info['module'].run):
+                async_tests[test_name] = test_info
+            else:
+                sync_tests[test_name] = test_info
+
+        original_stdout = sys.stdout
+        sys.stdout = _StdoutDispatcher(original_stdout)
+        try:
+            if async_tests:
+                asyncio.run(self._run_async_tests(async_tests))
+
+            if sync_tests:
+                max_workers = self.config.get('max_workers', min(32, len(sync_tests)))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(self._run_test_capture, test_name, test_info): test_name
+                        for test_name, test_info in sync_tests.items()
+                    }
+                    for future in as_completed(futures):
+                        test_name = futures[future]
+                        entry, output = future.result()
+                        self.results[test_name] = entry
+                        print(output, end='')
+        finally:
+            sys.stdout = original_stdout
+
         self.print_summary()
     
     def print_summary(self):
@@ -124,12 +301,38 @@ class EnumerationFramework:
     def save_results(self):
         output_file = self.config.get('output_file', 'enumeration_results.json')
         try:
-            with open(output_file, 'w') as f:
-                json.dump(self.results, f, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(b'{\n')
+                first = True
+                for test_name, result in self.results.items():
+                    if 'timestamp_ns' in result:
+                        result = dict(result)
+                        ns = result.pop('timestamp_ns')
+                        result['timestamp'] = datetime.fromtimestamp(ns / 1e9).isoformat()
+                    if not first:
+                        f.write(b',\n')
+                    f.write(_dumps(test_name) + b': ' + _dumps(result))
+                    first = False
+                f.write(b'\n}')
             print(f"\nResults saved to: {output_file}")
         except Exception as e:
             print(f"Error saving results: {e}")
 
+    def load_results(self, input_file=None):
+        if input_file is None:
+            input_file = self.config.get('output_file', 'enumeration_results.json')
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+
+        if ijson is not None:
+            with open(input_file, 'rb') as f:
+                yield from ijson.kvitems(f, '')
+        else:
+            with open(input_file, 'r') as f:
+                yield from json.load(f).items()
+
 
 def main():
     print("Start")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+
+_DEFAULT_PROBES = {
+    'kernel': 'uname -r',
+    'selinux': 'getenforce 2>/dev/null',
+}
+
+_probe_cache = None
+
+
+def run_batch(commands, timeout=10):
+    """
+    Spustí viacero lacných príkazov v jedinom shelli a vráti ich výstupy
+    ako {tag: stdout}. Jeden fork/exec namiesto jedného na každý príkaz.
+    """
+    script = '; '.join(
+        f"printf '\\0{tag}\\0'; {cmd}" for tag, cmd in commands.items()
+    )
+
+    try:
+        result = subprocess.run(
+            ['sh', '-c', script],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env={**os.environ, 'LC_ALL': 'C', 'LANG': 'C'}
+        )
+    except Exception:
+        return {}
+
+    outputs = {}
+    parts = iter(result.stdout.split('\0')[1:])
+    for tag in parts:
+        outputs[tag] = next(parts, '').strip()
+    return outputs
+
+
+def get_probe(tag):
+    global _probe_cache
+    if _probe_cache is None:
+        _probe_cache = run_batch(_DEFAULT_PROBES)
+    return _probe_cache.get(tag, '')
@@ -1,23 +1,70 @@
 #!/usr/bin/env python3
-import subprocess
-import re
+
+_UFW_FAIL = {
+    'status': 'FAIL',
+    'message': 'Firewall nie je aktivovaný',
+    'firewall_status': 'inactive',
+    'security_risk': 'Systém je zraniteľný voči neoprávneným sieťovým prístupom',
+    'recommendation': 'Aktivujte firewall a definujte základné pravidlá prístupu',
+    'commands': [
+        'sudo ufw default deny incoming',
+        'sudo ufw default allow outgoing',
+        'sudo ufw allow ssh',
+        'sudo ufw enable'
+    ],
+    'severity': 'HIGH',
+    'impact': 'Chýbajúca základná ochrana sieťovej vrstvy - častá zraniteľnosť v predvolených inštaláciách Ubuntu'
+}
+
+_UFW_PASS = {
+    'status': 'PASS',
+    'message': 'Firewall je aktívny',
+    'firewall_status': 'active',
+    'severity': 'INFO'
+}
+
+_UFW_UNKNOWN = {
+    'status': 'WARNING',
+    'message': 'Nepodarilo sa jednoznačne určiť stav firewallu',
+    'recommendation': 'Manuálne overte stav firewallu pomocou: sudo ufw status verbose'
+}
+
+_UFW_OUTCOMES = {}
+for _require_active in (False, True):
+    for _has_rules in (False, True):
+        _UFW_OUTCOMES[(True, _require_active, _has_rules)] = _UFW_PASS
+        _UFW_OUTCOMES[(False, _require_active, _has_rules)] = (
+            _UFW_FAIL if _require_active else _UFW_UNKNOWN)
+
+
+def read_ufw_config_status():
+    try:
+        with open('/var/lib/ufw/ufw.conf') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('ENABLED='):
+                    return line.split('=', 1)[1].strip().lower() == 'yes'
+    except OSError:
+        pass
+    return None
+
+
+def _c_env():
+    import os
+    return {**os.environ, 'LC_ALL': 'C', 'LANG': 'C'}
 
 
 def run(params):
+    import subprocess
+    import shutil
+
     print("Spúšťam test stavu firewallu...")
-    
+
     check_rules = params.get('check_rules', False)
     require_active = params.get('require_active', True)
-    
+
     try:
-        ufw_check = subprocess.run(
-            ['which', 'ufw'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if ufw_check.returncode != 0:
+        if shutil.which('ufw') is None:
             return {
                 'status': 'ERROR',
                 'message': 'UFW firewall nie je nainštalovaný',
@@ -25,74 +72,55 @@ def run(params):
                 'recommendation': 'Nainštalujte ufw pomocou: sudo apt install ufw',
                 'severity': 'HIGH'
             }
-        
-        result = subprocess.run(
-            ['sudo', 'ufw', 'status'],
-            capture_output=True,
-            text=True,
-            timeout=500
-        )
-        
-        if result.returncode != 0:
-            return {
-                'status': 'ERROR',
-                'message': 'Nepodarilo sa získať stav firewallu',
-                'error': result.stderr.strip(),
-                'note': 'Možno je potrebné spustiť skript s sudo oprávneniami'
-            }
-        
-        output = result.stdout.strip()
-        print(f"Výstup ufw status:\n{output}")
-        
-        is_active = 'Status: active' in output.lower() or 'stav: aktívny' in output.lower()
-        is_inactive = 'Status: inactive' in output.lower() or 'stav: neaktívny' in output.lower()
+
+        config_active = None
+        if not check_rules:
+            config_active = read_ufw_config_status()
+
+        if config_active is not None:
+            output = ''
+            is_active = config_active
+            is_inactive = not config_active
+            print(f"Stav firewallu podľa /var/lib/ufw/ufw.conf: "
+                  f"{'aktívny' if is_active else 'neaktívny'}")
+        else:
+            result = subprocess.run(
+                ['sudo', 'ufw', 'status'],
+                capture_output=True,
+                text=True,
+                timeout=500,
+                env=_c_env()
+            )
+
+            if result.returncode != 0:
+                return {
+                    'status': 'ERROR',
+                    'message': 'Nepodarilo sa získať stav firewallu',
+                    'error': result.stderr.strip(),
+                    'note': 'Možno je potrebné spustiť skript s sudo oprávneniami'
+                }
+
+            output = result.stdout.strip()
+            print(f"Výstup ufw status:\n{output}")
+
+            low = output.lower()
+            is_active = 'status: active' in low
+            is_inactive = 'status: inactive' in low
         
         rules = []
         if is_active and check_rules:
             rules = extract_firewall_rules(output)
-        
-        if not is_active and require_active:
-            return {
-                'status': 'FAIL',
-                'message': 'Firewall nie je aktivovaný',
-                'firewall_status': 'inactive',
-                'security_risk': 'Systém je zraniteľný voči neoprávneným sieťovým prístupom',
-                'recommendation': 'Aktivujte firewall a definujte základné pravidlá prístupu',
-                'commands': [
-                    'sudo ufw default deny incoming',
-                    'sudo ufw default allow outgoing',
-                    'sudo ufw allow ssh',
-                    'sudo ufw enable'
-                ],
-                'severity': 'HIGH',
-                'impact': 'Chýbajúca základná ochrana sieťovej vrstvy - častá zraniteľnosť v predvolených inštaláciách Ubuntu'
-            }
-        elif is_active:
-            result_data = {
-                'status': 'PASS',
-                'message': 'Firewall je aktívny',
-                'firewall_status': 'active',
-                'severity': 'INFO'
-            }
-            
-            if check_rules and rules:
-                result_data['active_rules'] = rules
-                result_data['rules_count'] = len(rules)
-                
-                if len(rules) == 0:
-                    result_data['status'] = 'WARNING'
-                    result_data['message'] = 'Firewall je aktívny, ale nie sú definované žiadne pravidlá'
-                    result_data['recommendation'] = 'Definujte pravidlá firewallu pre potrebné služby'
-            
-            return result_data
-        else:
-            return {
-                'status': 'WARNING',
-                'message': 'Nepodarilo sa jednoznačne určiť stav firewallu',
-                'firewall_output': output,
-                'recommendation': 'Manuálne overte stav firewallu pomocou: sudo ufw status verbose'
-            }
-            
+
+        result_data = dict(_UFW_OUTCOMES[(is_active, require_active, bool(rules))])
+
+        if rules:
+            result_data['active_rules'] = rules
+            result_data['rules_count'] = len(rules)
+        elif result_data['status'] == 'WARNING':
+            result_data['firewall_output'] = output
+
+        return result_data
+
     except subprocess.TimeoutExpired:
         return {
             'status': 'ERROR',
@@ -121,33 +149,27 @@ def run(params):
 
 
 def extract_firewall_rules(output):
-    rules = []
-    lines = output.split('\n')
-    
-    in_rules_section = False
+    lines = iter(output.splitlines())
     for line in lines:
-        if '---' in line or 'To' in line and 'Action' in line:
-            in_rules_section = True
-            continue
-        
-        if in_rules_section and line.strip():
-            parts = line.split()
-            if len(parts) >= 2:
-                rules.append({
-                    'raw': line.strip(),
-                    'service': parts[0] if len(parts) > 0 else 'unknown'
-                })
-    
-    return rules
+        if '---' in line or ('To' in line and 'Action' in line):
+            break
+    return [
+        {'raw': line.strip(), 'service': line.split(None, 1)[0]}
+        for line in lines
+        if line.strip() and not line.lstrip().startswith('--')
+    ]
 
 
 def check_ufw_without_sudo(params):
+    import subprocess
+
     try:
         result = subprocess.run(
             ['ufw', 'status'],
             capture_output=True,
             text=True,
-            timeout=5
+            timeout=5,
+            env=_c_env()
         )
         
         if 'must be root' in result.stderr.lower() or 'permission denied' in result.stderr.lower():
@@ -1,52 +1,50 @@
 #!/usr/bin/env python3
-import subprocess
-import re
+
+
+def _pack(version):
+    a, b, c = (version + (0, 0, 0))[:3]
+    return (a << 32) | (b << 16) | c
 
 
 def run(params):
+    import os
+
     print("Spúšťam test verzie jadra...")
-    
+
     min_kernel_version = params.get('min_kernel_version', '5.4.0')
-    
+
     try:
-        result = subprocess.run(
-            ['uname', '-r'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode != 0:
+        try:
+            kernel_version = os.uname().release
+        except AttributeError:
             return {
                 'status': 'ERROR',
                 'message': 'Nepodarilo sa získať verziu jadra',
-                'error': result.stderr.strip()
+                'error': 'os.uname nie je na tejto platforme dostupné'
             }
-        
-        kernel_version = result.stdout.strip()
         print(f"[+] Aktuálna verzia jadra: {kernel_version}")
         
-        version_match = re.match(r'(\d+)\.(\d+)\.(\d+)', kernel_version)
-        if not version_match:
+        try:
+            parts = kernel_version.split('-', 1)[0].split('.')[:3]
+            current_version = tuple(int(p) for p in parts)
+        except ValueError:
             return {
                 'status': 'ERROR',
                 'message': 'Nepodarilo sa extrahovať verziu jadra',
                 'kernel_version': kernel_version
             }
-        
-        current_version_parts = [int(x) for x in version_match.groups()]
-        
-        min_version_match = re.match(r'(\d+)\.(\d+)\.(\d+)', min_kernel_version)
-        if not min_version_match:
+
+        try:
+            min_parts = min_kernel_version.split('-', 1)[0].split('.')[:3]
+            min_version = tuple(int(p) for p in min_parts)
+        except ValueError:
             return {
                 'status': 'ERROR',
                 'message': 'Neplatný formát minimálnej verzie jadra',
                 'min_kernel_version': min_kernel_version
             }
-        
-        min_version_parts = [int(x) for x in min_version_match.groups()]
-        
-        is_outdated = compare_versions(current_version_parts, min_version_parts) < 0
+
+        is_outdated = _pack(current_version) < _pack(min_version)
         
         if is_outdated:
             return {
@@ -66,18 +64,6 @@ def run(params):
                 'min_recommended_version': min_kernel_version
             }
             
-    except subprocess.TimeoutExpired:
-        return {
-            'status': 'ERROR',
-            'message': 'Timeout pri vykonávaní príkazu uname',
-            'error': 'Príkaz trval príliš dlho'
-        }
-    except FileNotFoundError:
-        return {
-            'status': 'ERROR',
-            'message': 'Príkaz uname nebol nájdený',
-            'error': 'System neobsahuje príkaz uname'
-        }
     except Exception as e:
         return {
             'status': 'ERROR',
@@ -86,15 +72,6 @@ def run(params):
         }
 
 
-def compare_versions(version1, version2):
-    for v1, v2 in zip(version1, version2):
-        if v1 < v2:
-            return -1
-        elif v1 > v2:
-            return 1
-    return 0
-
-
 if __name__ == "__main__":
     test_params = {
         'min_kernel_version': '5.4.0'
@@ -1,7 +1,18 @@
 #!/usr/bin/env python3
-import subprocess
 import os
-import shutil
+import re
+import sys
+import functools
+
+_TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if _TESTS_DIR not in sys.path:
+    sys.path.insert(0, _TESTS_DIR)
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_path(name):
+    import shutil
+    return shutil.which(name)
 
 
 def run(params):
@@ -42,19 +53,22 @@ def run(params):
         }
 
 
+@functools.lru_cache(maxsize=1)
 def detect_mac_system():
-    if shutil.which('aa-status') or os.path.exists('/sys/kernel/security/apparmor'):
+    if _tool_path('aa-status') or os.path.exists('/sys/kernel/security/apparmor'):
         return 'apparmor'
-    
-    if shutil.which('getenforce') or os.path.exists('/etc/selinux/config'):
+
+    if _tool_path('getenforce') or os.path.exists('/etc/selinux/config'):
         return 'selinux'
-    
+
     return 'none'
 
 
 def check_apparmor(require_active, check_profiles):
+    import subprocess
+
     try:
-        if not shutil.which('aa-status'):
+        if not _tool_path('aa-status'):
             return {
                 'status': 'ERROR',
                 'message': 'AppArmor je prítomný, ale príkaz aa-status nie je dostupný',
@@ -62,15 +76,25 @@ def check_apparmor(require_active, check_profiles):
                 'recommendation': 'Nainštalujte apparmor-utils: sudo apt install apparmor-utils'
             }
         
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ['sudo', 'aa-status'],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=10
+            env={**os.environ, 'LC_ALL': 'C', 'LANG': 'C'}
         )
-        
-        if result.returncode != 0:
-            stderr_output = result.stderr.strip().lower()
+        # Stačí prefix výstupu - hlavičky a prvých pár profilov; na
+        # systémoch so stovkami profilov netreba čítať celé megabajty.
+        output = proc.stdout.read(_AA_OUTPUT_CAP)
+        if proc.poll() is None:
+            proc.terminate()
+        returncode = proc.wait(timeout=10)
+        stderr_text = proc.stderr.read()
+        proc.stdout.close()
+        proc.stderr.close()
+
+        if not output and returncode != 0:
+            stderr_output = stderr_text.strip().lower()
             
             if 'apparmor filesystem is not mounted' in stderr_output or \
                'apparmor is not enabled' in stderr_output:
@@ -93,11 +117,10 @@ def check_apparmor(require_active, check_profiles):
                 return {
                     'status': 'ERROR',
                     'message': 'Chyba pri kontrole stavu AppArmor',
-                    'error': result.stderr.strip(),
+                    'error': stderr_text.strip(),
                     'note': 'Možno je potrebné spustiť skript s sudo oprávneniami'
                 }
-        
-        output = result.stdout
+
         apparmor_info = parse_apparmor_status(output)
         
         print(f"AppArmor je aktívny")
@@ -166,6 +189,20 @@ def check_apparmor(require_active, check_profiles):
         }
 
 
+_AA_OUTPUT_CAP = 131072  # 128 KiB prefixu aa-status výstupu
+
+_AA_PROFILE_RE = re.compile(r'(?m)^[ \t]+(/.*\S)[ \t]*$')
+
+_AA_KEYS = (
+    ('profiles are loaded', 'profiles_loaded'),
+    ('profiles loaded', 'profiles_loaded'),
+    ('profiles are in enforce mode', 'profiles_enforce'),
+    ('profiles are in complain mode', 'profiles_complain'),
+    ('processes have profiles defined', 'processes_with_profiles'),
+    ('processes are defined', 'processes_with_profiles'),
+)
+
+
 def parse_apparmor_status(output):
     info = {
         'is_loaded': False,
@@ -175,61 +212,41 @@ def parse_apparmor_status(output):
         'processes_with_profiles': 0,
         'profile_names': []
     }
-    
-    lines = output.split('\n')
-    
-    for line in lines:
-        line_lower = line.lower()
-        
-        if 'apparmor module is loaded' in line_lower:
+
+    for line in output.split('\n'):
+        low = line.lower()
+        parts = low.split()
+        if not parts:
+            continue
+
+        if 'apparmor module is loaded' in low:
             info['is_loaded'] = True
-        
-        if 'profiles are loaded' in line_lower or 'profiles loaded' in line_lower:
-            parts = line.split()
-            if parts and parts[0].isdigit():
-                info['profiles_loaded'] = int(parts[0])
-        
-        if 'profiles are in enforce mode' in line_lower:
-            parts = line.split()
-            if parts and parts[0].isdigit():
-                info['profiles_enforce'] = int(parts[0])
-        
-        if 'profiles are in complain mode' in line_lower:
-            parts = line.split()
-            if parts and parts[0].isdigit():
-                info['profiles_complain'] = int(parts[0])
-        
-        if 'processes have profiles defined' in line_lower or 'processes are defined' in line_lower:
-            parts = line.split()
-            if parts and parts[0].isdigit():
-                info['processes_with_profiles'] = int(parts[0])
-        
-        if line.startswith('   /') or line.startswith('      /'):
-            profile_name = line.strip()
-            if profile_name:
-                info['profile_names'].append(profile_name)
-    
+            continue
+
+        if parts[0].isdigit():
+            for key, field in _AA_KEYS:
+                if key in low:
+                    info[field] = int(parts[0])
+                    break
+
+    info['profile_names'] = _AA_PROFILE_RE.findall(output)
+
     return info
 
 
 def check_selinux(require_active):
+    import _probe
+
     try:
-        result = subprocess.run(
-            ['getenforce'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode != 0:
+        selinux_status = _probe.get_probe('selinux').lower()
+
+        if not selinux_status:
             return {
                 'status': 'ERROR',
-                'message': 'Chyba pri kontrole stavu SELinux',
-                'error': result.stderr.strip()
+                'message': 'Príkaz getenforce nebol nájdený alebo zlyhal',
+                'error': 'SELinux nástroje nie sú nainštalované'
             }
         
-        selinux_status = result.stdout.strip().lower()
-        
         if selinux_status == 'enforcing':
             return {
                 'status': 'PASS',
@@ -266,12 +283,6 @@ def check_selinux(require_active):
                 'selinux_mode': selinux_status
             }
         
-    except FileNotFoundError:
-        return {
-            'status': 'ERROR',
-            'message': 'Príkaz getenforce nebol nájdený',
-            'error': 'SELinux nástroje nie sú nainštalované'
-        }
     except Exception as e:
         return {
             'status': 'ERROR',
@@ -1,8 +1,43 @@
 #!/usr/bin/env python3
-import subprocess
 import os
+import sys
 import stat
-import pwd
+from concurrent.futures import ThreadPoolExecutor
+
+_MSG_WORLD_READABLE = 'Adresár je čitateľný pre všetkých používateľov (other readable)'
+_MSG_WORLD_WRITABLE = 'Adresár je zapisovateľný pre všetkých používateľov (other writable) - KRITICKÉ!'
+_MSG_OTHER_ACCESS = 'Ostatní používatelia majú prístup do adresára (other executable)'
+_MSG_GROUP_WRITABLE = 'Skupina má právo zápisu do adresára (group writable)'
+
+_uid_cache = {}
+_pwd = None
+
+
+def _owner_name(uid):
+    global _pwd
+    if _pwd is None:
+        import pwd as _pwd
+
+    name = _uid_cache.get(uid)
+    if name is None:
+        try:
+            name = _pwd.getpwuid(uid).pw_name
+        except KeyError:
+            name = f'UID:{uid}'
+        _uid_cache[uid] = name
+    return name
+
+
+def _prime_uid_cache():
+    global _pwd
+    if _pwd is None:
+        import pwd as _pwd
+
+    try:
+        for entry in _pwd.getpwall():
+            _uid_cache.setdefault(entry.pw_uid, entry.pw_name)
+    except Exception:
+        pass
 
 
 def run(params):
@@ -13,6 +48,8 @@ def run(params):
     check_world_writable = params.get('check_world_writable', True)
     check_group_writable = params.get('check_group_writable', True)
     max_permissions = params.get('max_permissions', '755')
+    include_secure_details = params.get('include_secure_details', False)
+    include_symbolic = params.get('include_symbolic', False)
     
     try:
         if not os.path.exists(home_base_dir):
@@ -22,12 +59,20 @@ def run(params):
                 'error': 'Nemožno kontrolovať domovské adresáre'
             }
         
-        home_dirs = []
         try:
-            for entry in os.listdir(home_base_dir):
-                full_path = os.path.join(home_base_dir, entry)
-                if os.path.isdir(full_path):
-                    home_dirs.append(full_path)
+            # O_PATH-štýl prístupu: adresár sa otvorí raz a deti sa statujú
+            # relatívne k fd, takže jadro nerieši celú cestu pre každý záznam.
+            home_fd = os.open(home_base_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                with os.scandir(home_fd) as entries:
+                    home_dirs = [
+                        (os.path.join(home_base_dir, entry.name),
+                         entry.stat(follow_symlinks=False))
+                        for entry in entries
+                        if entry.is_dir(follow_symlinks=False)
+                    ]
+            finally:
+                os.close(home_fd)
         except PermissionError:
             return {
                 'status': 'ERROR',
@@ -44,66 +89,78 @@ def run(params):
             }
         
         print(f"Nájdených {len(home_dirs)} domovských adresárov")
-        
-        insecure_dirs = []
-        secure_dirs = []
-        
-        for home_dir in home_dirs:
-            result = check_directory_permissions(
-                home_dir, 
-                check_world_readable,
-                check_world_writable,
-                check_group_writable,
-                max_permissions
-            )
-            
-            if result['is_insecure']:
-                insecure_dirs.append(result)
-                print(f"Nebezpečné oprávnenia: {home_dir} - {result['permissions_octal']}")
+
+        # Jedno prečítanie passwd databázy pre celý beh namiesto
+        # getpwuid na každý adresár.
+        _prime_uid_cache()
+
+        checks = []
+        if check_world_readable:
+            checks.append((stat.S_IROTH, _MSG_WORLD_READABLE))
+        if check_world_writable:
+            checks.append((stat.S_IWOTH, _MSG_WORLD_WRITABLE))
+        if check_group_writable:
+            checks.append((stat.S_IWGRP, _MSG_GROUP_WRITABLE))
+        checks = tuple(checks)
+        bad_mask = 0
+        for bit, _msg in checks:
+            bad_mask |= bit
+        max_permissions_int = int(max_permissions, 8)
+
+        with ThreadPoolExecutor(max_workers=min(32, len(home_dirs))) as executor:
+            results = list(executor.map(
+                lambda item: check_directory_permissions(
+                    item[0], item[1], checks, max_permissions_int, bad_mask,
+                    include_symbolic=include_symbolic),
+                home_dirs))
+
+        insecure_summary = []
+        secure_summary = []
+        log_lines = []
+        for is_insecure, summary in results:
+            permissions = summary.get('permissions', '?')
+            if is_insecure:
+                insecure_summary.append(summary)
+                log_lines.append(f"Nebezpečné oprávnenia: {summary['path']} - {permissions}")
             else:
-                secure_dirs.append(result)
-                print(f"Bezpečné oprávnenia: {home_dir} - {result['permissions_octal']}")
-        
-        if insecure_dirs:
-            issues_summary = []
-            for dir_info in insecure_dirs:
-                issues_summary.append({
-                    'path': dir_info['path'],
-                    'permissions': dir_info['permissions_octal'],
-                    'issues': dir_info['issues'],
-                    'owner': dir_info.get('owner', 'unknown')
-                })
-            
-            return {
+                secure_summary.append(summary)
+                log_lines.append(f"Bezpečné oprávnenia: {summary['path']} - {permissions}")
+
+        if log_lines:
+            sys.stdout.write('\n'.join(log_lines) + '\n')
+
+        if insecure_summary:
+            result_data = {
                 'status': 'FAIL',
-                'message': f'Zistené nebezpečné prístupové práva v {len(insecure_dirs)} domovských adresároch',
-                'insecure_directories_count': len(insecure_dirs),
-                'secure_directories_count': len(secure_dirs),
-                'insecure_directories': issues_summary,
+                'message': f'Zistené nebezpečné prístupové práva v {len(insecure_summary)} domovských adresároch',
+                'insecure_directories_count': len(insecure_summary),
+                'secure_directories_count': len(secure_summary),
+                'insecure_directories': insecure_summary[:100],
                 'security_risk': 'Príliš permisívne nastavenia môžu viesť k prístupu neoprávnených používateľov k súkromným dátam',
                 'severity': 'HIGH',
                 'recommendation': 'Upravte prístupové práva domovských adresárov na bezpečné hodnoty (napr. 750 alebo 700)',
                 'commands': [
-                    f'sudo chmod 750 {insecure_dirs[0]["path"]}',
+                    f'sudo chmod 750 {insecure_summary[0]["path"]}',
                     'sudo chmod 750 /home/*',
                     'sudo chmod 700 /home/username'
                 ],
                 'impact': 'Nedostatky v prístupových právach môžu umožniť neautorizovaný prístup k súkromným dátam používateľov'
             }
+            if len(insecure_summary) > 100:
+                result_data['note'] = f'Zobrazených prvých 100 z {len(insecure_summary)} adresárov'
+            return result_data
         else:
-            return {
+            result_data = {
                 'status': 'PASS',
                 'message': 'Všetky domovské adresáre mají bezpečné prístupové práva',
                 'checked_directories_count': len(home_dirs),
-                'secure_directories': [
-                    {
-                        'path': d['path'],
-                        'permissions': d['permissions_octal'],
-                        'owner': d.get('owner', 'unknown')
-                    } for d in secure_dirs
-                ],
                 'severity': 'INFO'
             }
+            if include_secure_details:
+                result_data['secure_directories'] = secure_summary
+            else:
+                result_data['secure_directories'] = {'count': len(secure_summary)}
+            return result_data
         
     except Exception as e:
         return {
@@ -113,62 +170,50 @@ def run(params):
         }
 
 
-def check_directory_permissions(dir_path, check_world_readable, check_world_writable, 
-                                 check_group_writable, max_permissions):
-    result = {
-        'path': dir_path,
-        'is_insecure': False,
-        'issues': []
-    }
-    
+def check_directory_permissions(dir_path, stat_info, checks, max_permissions_int,
+                                 bad_mask, detailed=True, include_symbolic=False):
+    summary = {'path': dir_path}
+
     try:
-        stat_info = os.stat(dir_path)
         mode = stat_info.st_mode
-        
-        permissions_octal = oct(stat.S_IMODE(mode))[2:]
-        result['permissions_octal'] = permissions_octal
-        result['permissions_symbolic'] = stat.filemode(mode)
-        
-        try:
-            owner_info = pwd.getpwuid(stat_info.st_uid)
-            result['owner'] = owner_info.pw_name
-        except KeyError:
-            result['owner'] = f'UID:{stat_info.st_uid}'
-        
-        if check_world_readable and mode & stat.S_IROTH:
-            result['is_insecure'] = True
-            result['issues'].append('Adresár je čitateľný pre všetkých používateľov (other readable)')
-        
-        if check_world_writable and mode & stat.S_IWOTH:
-            result['is_insecure'] = True
-            result['issues'].append('Adresár je zapisovateľný pre všetkých používateľov (other writable) - KRITICKÉ!')
-        
-        if mode & stat.S_IXOTH and (mode & stat.S_IROTH or mode & stat.S_IWOTH):
-            result['is_insecure'] = True
-            result['issues'].append('Ostatní používatelia majú prístup do adresára (other executable)')
-        
-        if check_group_writable and mode & stat.S_IWGRP:
-            result['is_insecure'] = True
-            result['issues'].append('Skupina má právo zápisu do adresára (group writable)')
-        
-        permissions_int = int(permissions_octal, 8)
-        max_permissions_int = int(max_permissions, 8)
-        
-        if permissions_int > max_permissions_int:
-            result['is_insecure'] = True
-            result['issues'].append(f'Oprávnenia ({permissions_octal}) presahujú maximálnu odporúčanú hodnotu ({max_permissions})')
-        
-        if permissions_octal == '777':
-            result['is_insecure'] = True
-            result['issues'].append('KRITICKÉ: Adresár má úplne otvorené oprávnenia (777) - prístupný pre všetkých!')
-        
+
+        perm_int = stat.S_IMODE(mode)
+        permissions_octal = format(perm_int, 'o')
+        summary['permissions'] = permissions_octal
+        if include_symbolic:
+            summary['permissions_symbolic'] = stat.filemode(mode)
+        summary['owner'] = _owner_name(stat_info.st_uid)
+
+        other_access = mode & stat.S_IXOTH and mode & (stat.S_IROTH | stat.S_IWOTH)
+        insecure = bool(mode & bad_mask or other_access
+                        or perm_int > max_permissions_int or perm_int == 0o777)
+
+        # Bezpečný adresár (bežný prípad) ani volajúci bez záujmu o detaily
+        # nepotrebujú zoznam problémov.
+        if not insecure or not detailed:
+            return insecure, summary
+
+        issues = [msg for bit, msg in checks if mode & bit]
+
+        if other_access:
+            issues.append(_MSG_OTHER_ACCESS)
+
+        if perm_int > max_permissions_int:
+            issues.append(f'Oprávnenia ({permissions_octal}) presahujú maximálnu '
+                          f'odporúčanú hodnotu ({format(max_permissions_int, "o")})')
+
+        if perm_int == 0o777:
+            issues.append('KRITICKÉ: Adresár má úplne otvorené oprávnenia (777) - prístupný pre všetkých!')
+
+        summary['issues'] = issues
+        return True, summary
+
     except PermissionError:
-        result['is_insecure'] = False
-        result['error'] = 'Nedostatočné oprávnenia na kontrolu tohto adresára'
+        summary['error'] = 'Nedostatočné oprávnenia na kontrolu tohto adresára'
     except Exception as e:
-        result['error'] = str(e)
-    
-    return result
+        summary['error'] = str(e)
+
+    return False, summary
 
 
 def get_recommended_permissions(current_permissions):
@@ -1,60 +1,99 @@
 #!/usr/bin/env python3
-import subprocess
 import re
+import threading
+import os
+import time
+
+_UPGRADE_RE = re.compile(
+    r'^([^\s/]+)/?([^\s]*)\s+([^\s]+)\s+([^\s]+)\s*(?:\[upgradable from:\s*([^\]]+)\])?')
 
 
 def run(params):
+    import subprocess
+
     print("Spúšťam test dostupných aktualizácií...")
     
     max_updates_warning = params.get('max_updates_warning', 10)
     max_updates_critical = params.get('max_updates_critical', 50)
     check_security_only = params.get('check_security_only', False)
-    
+    apt_update_ttl = params.get('apt_update_ttl', 3600)
+
     try:
-        print("Aktualizujem zoznam balíkov...")
-        update_result = subprocess.run(
-            ['sudo', 'apt', 'update'],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        if update_result.returncode != 0:
-            print(f"Varovanie pri apt update: {update_result.stderr}")
-        
-        result = subprocess.run(
+        cache_age = None
+        try:
+            age = time.time() - os.stat('/var/lib/apt/lists/partial').st_mtime
+            cache_age = int(age)
+            skip_update = age < apt_update_ttl
+        except OSError:
+            skip_update = False
+
+        if skip_update:
+            print(f"Zoznam balíkov je čerstvý ({cache_age} s), preskakujem apt update")
+        else:
+            print("Aktualizujem zoznam balíkov...")
+            update_result = subprocess.run(
+                ['sudo', 'apt', 'update'],
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+
+            if update_result.returncode != 0:
+                print(f"Varovanie pri apt update: {update_result.stderr}")
+
+        # apt update drží zámok a musí bežať samostatne, ale obe ďalšie
+        # otázky sú len na čítanie a môžu bežať súbežne.
+        security_holder = {}
+        security_thread = None
+        if check_security_only:
+            security_thread = threading.Thread(
+                target=lambda: security_holder.setdefault('v', check_security_updates()))
+            security_thread.start()
+
+        proc = subprocess.Popen(
             ['apt', 'list', '--upgradable'],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=30
+            bufsize=1
         )
-        
-        if result.returncode != 0:
+        upgradable_packages = parse_upgradable_packages(proc.stdout)
+        stderr_text = proc.stderr.read()
+        try:
+            returncode = proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise
+        finally:
+            proc.stdout.close()
+            proc.stderr.close()
+
+        if returncode != 0:
             return {
                 'status': 'ERROR',
                 'message': 'Nepodarilo sa získať zoznam aktualizácií',
-                'error': result.stderr.strip()
+                'error': stderr_text.strip()
             }
         
-        output = result.stdout.strip()
-        
-        upgradable_packages = parse_upgradable_packages(output)
-        
         security_updates = []
-        if check_security_only:
-            security_updates = check_security_updates()
+        if security_thread is not None:
+            security_thread.join(timeout=30)
+            security_updates = security_holder.get('v', [])
         
         total_updates = len(upgradable_packages)
         
         print(f"Nájdených {total_updates} aktualizovateľných balíkov")
         
         if total_updates == 0:
-            return {
+            result_data = {
                 'status': 'PASS',
                 'message': 'Systém je aktuálny, žiadne dostupné aktualizácie',
                 'upgradable_packages_count': 0,
                 'severity': 'INFO'
             }
+            if cache_age is not None:
+                result_data['cache_age_seconds'] = cache_age
+            return result_data
         
         if total_updates >= max_updates_critical:
             status = 'CRITICAL'
@@ -85,6 +124,9 @@ def run(params):
             'impact': 'Zastarané komponenty sú jednou z najkritickejších oblastí správy serverov'
         }
         
+        if cache_age is not None:
+            result_data['cache_age_seconds'] = cache_age
+
         if total_updates > 20:
             result_data['note'] = f'Zobrazených prvých 20 z {total_updates} balíkov'
             result_data['full_list_available'] = True
@@ -126,49 +168,84 @@ def run(params):
         }
 
 
-def parse_upgradable_packages(output):
+def parse_upgradable_packages(lines):
     packages = []
-    lines = output.split('\n')
-    
+
     for line in lines:
-        if 'Listing...' in line or not line.strip():
+        line = line.rstrip('\n')
+        # Balíky sú malými písmenami, takže 'L' spoľahlivo odfiltruje
+        # hlavičku 'Listing...' bez substring hľadania.
+        if not line or line[0] == 'L':
             continue
-        
-        match = re.match(r'^([^\s/]+)/?([^\s]*)\s+([^\s]+)\s+([^\s]+)\s*(?:\[upgradable from:\s*([^\]]+)\])?', line)
-        
-        if match:
-            package_name = match.group(1)
-            suite = match.group(2) if match.group(2) else 'unknown'
-            new_version = match.group(3)
-            arch = match.group(4)
-            old_version = match.group(5) if match.group(5) else 'unknown'
-            
+
+        parts = line.split(None, 3)
+
+        if len(parts) >= 3:
+            name_suite = parts[0]
+            slash = name_suite.find('/')
+            if slash >= 0:
+                package_name = name_suite[:slash]
+                suite = name_suite[slash + 1:] or 'unknown'
+            else:
+                package_name = name_suite
+                suite = 'unknown'
+
+            old_version = 'unknown'
+            rest = parts[3] if len(parts) > 3 else ''
+            if rest.startswith('[upgradable from:'):
+                end = rest.rfind(']')
+                old_version = rest[17:end if end >= 0 else None].strip() or 'unknown'
+
             packages.append({
                 'name': package_name,
                 'suite': suite,
                 'current_version': old_version,
-                'available_version': new_version,
-                'architecture': arch
+                'available_version': parts[1],
+                'architecture': parts[2]
             })
-        else:
-            parts = line.split()
-            if len(parts) >= 1:
-                package_name = parts[0].split('/')[0]
-                packages.append({
-                    'name': package_name,
-                    'raw': line.strip()
-                })
-    
+            continue
+
+        # Netypický riadok - ponechaný pôvodný regex ako záchytná sieť.
+        match = _UPGRADE_RE.match(line)
+        if not match:
+            continue
+
+        packages.append({
+            'name': match.group(1),
+            'suite': match.group(2) if match.group(2) else 'unknown',
+            'current_version': match.group(5) if match.group(5) else 'unknown',
+            'available_version': match.group(3),
+            'architecture': match.group(4)
+        })
+
     return packages
 
 
+_sec_cache = {'key': None, 'value': None}
+
+
+def _sec_cache_key():
+    try:
+        return (os.stat('/var/lib/dpkg/status').st_mtime,
+                os.stat('/var/lib/apt/lists').st_mtime)
+    except OSError:
+        return None
+
+
 def check_security_updates():
     """
     Kontroluje špecificky bezpečnostné aktualizácie pomocou unattended-upgrades
-    alebo apt-get upgrade --simulate.
+    alebo apt-get upgrade --simulate. Výsledok sa cachuje podľa mtime dpkg
+    databázy a apt zoznamov - kým sa nič nezmenilo, nie je čo prepočítavať.
     """
+    import subprocess
+
+    key = _sec_cache_key()
+    if key is not None and _sec_cache['key'] == key:
+        return _sec_cache['value']
+
     security_packages = []
-    
+
     try:
         result = subprocess.run(
             ['apt-get', '--just-print', 'upgrade'],
@@ -176,18 +253,26 @@ def check_security_updates():
             text=True,
             timeout=30
         )
-        
+
         if result.returncode == 0:
             output = result.stdout
             for line in output.split('\n'):
-                if 'security' in line.lower() and 'Inst' in line:
+                # 'Inst ' odfiltruje >99% riadkov skôr, než sa alokuje
+                # lowercase kópia pre substring hľadanie.
+                if line.startswith('Inst ') and 'security' in line.lower():
                     parts = line.split()
                     if len(parts) >= 2:
                         security_packages.append(parts[1])
-        
+
+            # Cachuje sa len úspešný beh - zlyhaný apt-get by inak uložil
+            # prázdny zoznam a ďalšie volania by ho vracali ako platný výsledok.
+            if key is not None:
+                _sec_cache['key'] = key
+                _sec_cache['value'] = security_packages
+
     except Exception as e:
         print(f"Chyba pri kontrole bezpečnostných aktualizácií: {e}")
-    
+
     return security_packages
 
 